@@ -4,7 +4,6 @@ Report Generator for AI Competitor Tracker
 Creates markdown reports from scraped data
 """
 
-import json
 import logging
 from collections import defaultdict
 from datetime import datetime, timedelta
@@ -14,6 +13,8 @@ from typing import Dict, List, Optional
 import pandas as pd
 from jinja2 import Template
 
+from utils import load_json_file, read_json_lines
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -114,21 +115,31 @@ No recent updates found.
         """Load the most recent data for each competitor"""
         competitor_data = {}
 
-        # Get all JSON files
+        # Each competitor's latest result is the last line of its .jsonl file
+        results = []
+        for file in self.data_dir.glob("*.jsonl"):
+            results.extend(read_json_lines(file, last=1))
+
+        # Per-scrape JSON files written before results were appended
         json_files = sorted(
             self.data_dir.glob("*.json"),
             key=lambda x: x.stat().st_mtime,
             reverse=True
         )
-
         for file in json_files:
-            with open(file, 'r') as f:
-                data = json.load(f)
-                competitor = data.get('competitor')
+            data = load_json_file(file)
+            if data:
+                results.append(data)
+
+        for data in results:
+            competitor = data.get('competitor')
+            if not competitor:
+                continue
 
-                # Keep only the most recent data for each competitor
-                if competitor and competitor not in competitor_data:
-                    competitor_data[competitor] = data
+            # Keep only the most recent data for each competitor
+            latest = competitor_data.get(competitor)
+            if latest is None or (data.get('timestamp') or '') > (latest.get('timestamp') or ''):
+                competitor_data[competitor] = data
 
         return list(competitor_data.values())
 
@@ -4,13 +4,12 @@ Example usage script for AI Competitor Tracker
 Demonstrates how to use the scraper and report generator
 """
 
-import json
 import sys
 from datetime import datetime
 from pathlib import Path
 
 # Ensure required directories exist
-from utils import ensure_directories, calculate_statistics
+from utils import ensure_directories, calculate_statistics, append_json_line
 
 def run_example():
     """Run example demonstration of the AI Competitor Tracker"""
@@ -75,15 +74,15 @@ def run_example():
                     'title': 'Sample Article Title',
                     'date': datetime.now().isoformat(),
                     'content_preview': 'This is a sample article for demonstration purposes.',
-                    'link': 'https://example.com/article'
+                    'link': 'https://example.com/article',
+                    'permalink': True
                 }
             ],
             'article_count': 1
         }
         # Save sample data
-        sample_file = Path("data/raw") / f"sample_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(sample_file, 'w') as f:
-            json.dump(sample_data, f, indent=2)
+        sample_file = Path("data/raw") / "Sample_Company.jsonl"
+        append_json_line(sample_data, sample_file)
         print(f"   Created sample data at: {sample_file}")
     print()
 
@@ -109,6 +108,7 @@ def run_example():
     print("📈 Step 6: Data Statistics")
     stats = calculate_statistics()
     print(f"   Total files: {stats['total_files']}")
+    print(f"   Total results: {stats['total_results']}")
     print(f"   Total articles: {stats['total_articles']}")
     print(f"   Competitors tracked: {len(stats['competitors'])}")
     print()
@@ -4,7 +4,6 @@ Scheduler for AI Competitor Tracker
 Automates daily scraping and report generation
 """
 
-import json
 import logging
 import time
 from datetime import datetime
@@ -14,6 +13,7 @@ import schedule
 
 from scraper import CompetitorScraper
 from report_generator import ReportGenerator
+from utils import load_config
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +21,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Upper bound on a single sleep so clock changes (suspend, NTP) are noticed
+MAX_IDLE_SLEEP = 3600
+
+
+def run_scheduled_jobs():
+    """Run scheduled jobs forever, sleeping until the next one is due"""
+    while True:
+        schedule.run_pending()
+        idle_seconds = schedule.idle_seconds()
+        if idle_seconds is None:
+            logger.info("No scheduled jobs left")
+            return
+        time.sleep(min(max(idle_seconds, 0), MAX_IDLE_SLEEP))
+
 
 class CompetitorTrackerScheduler:
     """Scheduler for automated competitive intelligence gathering"""
@@ -34,12 +48,15 @@ class CompetitorTrackerScheduler:
     def _load_config(self, config_path: str) -> dict:
         """Load configuration from JSON file"""
         try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
+            return load_config(config_path)
         except FileNotFoundError:
             logger.error(f"Config file {config_path} not found")
             return {}
 
+    def close(self):
+        """Release resources held by the long-lived scraper"""
+        self.scraper.close()
+
     def run_daily_task(self):
         """Execute daily scraping and report generation"""
         logger.info("=" * 60)
@@ -89,9 +106,7 @@ class CompetitorTrackerScheduler:
         logger.info("Scheduler is running. Press Ctrl+C to stop.")
 
         # Keep the scheduler running
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        run_scheduled_jobs()
 
     def run_once(self):
         """Run the scraping and report generation once"""
@@ -107,9 +122,10 @@ def schedule_daily_scrape(hour: int = 9, minute: int = 0):
 
     logger.info(f"Scheduled daily scraping at {time_str}")
 
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    try:
+        run_scheduled_jobs()
+    finally:
+        scheduler.close()
 
 
 def main():
@@ -132,15 +148,18 @@ def main():
 
     scheduler = CompetitorTrackerScheduler()
 
-    if args.once:
-        print("Running competitive intelligence gathering once...")
-        scheduler.run_once()
-    else:
-        print(f"Starting scheduler for daily runs at {args.time}...")
-        # Update config with command line time if provided
-        scheduler.config['schedule'] = scheduler.config.get('schedule', {})
-        scheduler.config['schedule']['time'] = args.time
-        scheduler.schedule_daily_scraping()
+    try:
+        if args.once:
+            print("Running competitive intelligence gathering once...")
+            scheduler.run_once()
+        else:
+            print(f"Starting scheduler for daily runs at {args.time}...")
+            # Update config with command line time if provided
+            scheduler.config['schedule'] = scheduler.config.get('schedule', {})
+            scheduler.config['schedule']['time'] = args.time
+            scheduler.schedule_daily_scraping()
+    finally:
+        scheduler.close()
 
 
 if __name__ == "__main__":
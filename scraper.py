@@ -4,25 +4,696 @@ AI Competitor Tracker - Web Scraper
 Monitors AI company websites for competitive intelligence
 """
 
+import asyncio
+import atexit
+import codecs
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import heapq
+import itertools
 import json
 import logging
+import re
 import time
+from collections import defaultdict
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
+import aiohttp
+import lxml.etree
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+import soupsieve
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
+from bs4.dammit import EncodingDetector
+from cssselect import HTMLTranslator
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from utils import (
+    append_json_line, article_key, dedup_key, load_config, load_json_files, loads_json,
+    read_json_lines, save_json_file
+)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional parser backend
+    LexborHTMLParser = None
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Fallback selectors for competitors that don't configure their own
+DEFAULT_ARTICLE_SELECTOR = 'article'
+DEFAULT_TITLE_SELECTOR = 'h2, h3'
+DEFAULT_DATE_SELECTOR = 'time'
+DEFAULT_CONTENT_SELECTOR = 'p'
+LINK_SELECTOR = 'a'
+HREF_SELECTOR = 'a[href]'
+
+DEFAULT_PARSER = 'lxml'
+MAX_CONTENT_LENGTH = 500
+CONTENT_PREVIEW_ELEMENTS = 3
+STREAM_CHUNK_SIZE = 16384
+# Leading bytes searched for a <meta charset> (bs4 looks at the first 2 KB)
+ENCODING_SNIFF_BYTES = 2048
+# Article listings sit near the top of the page; anything past this is not
+# worth downloading or parsing
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+# Connection pools: hosts kept, and connections kept alive per host. HTTP/1.1
+# connections stay open between requests until the server's Keep-Alive
+# timeout closes them, so revisiting a host skips the TCP/TLS handshake
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+
+# Responses worth retrying, and how often the async path retries them
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_FETCH_RETRIES = 3
+MAX_RETRY_DELAY = 60
+
+# Competitor settings that change what is extracted from the same page
+EXTRACTION_SETTINGS = (
+    'url', 'selector', 'title_selector', 'date_selector', 'content_selector',
+    'article_href_pattern'
+)
+
+# Timestamp embedded in legacy per-scrape result filenames; it sorts
+# chronologically
+RESULT_TIMESTAMP = re.compile(r'_(\d{8}_\d{6})\.json$')
+
+# Seconds a cached page is reused without asking the server at all
+DEFAULT_CACHE_EXPIRE_AFTER = 3600
+
+# Bytes of BLAKE2b digest stored per seen article
+SEEN_DIGEST_SIZE = 8
+
+_css_translator = HTMLTranslator()
+
+# Bracketed attribute tests, which may legitimately contain spaces or colons
+_ATTRIBUTE_TESTS = re.compile(r"\[[^\]]*\]")
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_selector(selector: str) -> soupsieve.SoupSieve:
+    """Compile a CSS selector once and reuse it for every element and page"""
+    return soupsieve.compile(selector)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Compile a per-competitor regex from config.json once"""
+    return re.compile(pattern)
+
+
+@functools.lru_cache(maxsize=1024)
+def _join(base_url: str, href: str) -> str:
+    """urljoin, memoized since nav and category links repeat across pages"""
+    return urljoin(base_url, href)
+
+
+@functools.lru_cache(maxsize=64)
+def _article_strainer(selector: str) -> Optional[SoupStrainer]:
+    """Build a SoupStrainer that keeps only elements matching selector
+
+    Only selectors whose every comma-separated part tests the element itself
+    qualify; combinators and pseudo-classes depend on ancestors or siblings
+    the strainer would already have thrown away, so those get None.
+    """
+    for part in _ATTRIBUTE_TESTS.sub('', selector).split(','):
+        part = part.strip()
+        if not part or any(c in part for c in ' >+~:'):
+            return None
+
+    compiled = _compile_selector(selector)
+
+    def match(name, attrs=None):
+        # bs4 4.13+ only hands strainer functions the tag name, which is not
+        # enough to evaluate the selector; keep everything there instead
+        if attrs is None:
+            return True
+        return compiled.match(Tag(name=name, attrs=attrs))
+
+    return SoupStrainer(match)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_xpath(selector: str, prefix: str = 'descendant::',
+                   limit: Optional[int] = None) -> lxml.etree.XPath:
+    """Translate a CSS selector from config.json into a compiled XPath"""
+    xpath = _css_translator.css_to_xpath(selector, prefix=prefix)
+    if limit is not None:
+        xpath = f"({xpath})[position() <= {limit}]"
+    return lxml.etree.XPath(xpath)
+
+
+def _clean_text(text: str, max_length: Optional[int] = None) -> str:
+    """Collapse whitespace runs to single spaces, so every backend gives the
+    same titles and previews for the same markup"""
+    return ' '.join(text.split())[:max_length].rstrip()
+
+
+def _declared_encoding(head: bytes, encoding: Optional[str]) -> Optional[str]:
+    """The page charset from the HTTP header, else a BOM or <meta> in head
+
+    Names Python has no codec for (e.g. utf8mb4) are skipped.
+    """
+    candidates = (
+        encoding,
+        EncodingDetector.strip_byte_order_mark(head)[1],
+        EncodingDetector.find_declared_encoding(head, is_html=True),
+    )
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            codecs.lookup(candidate)
+        except LookupError:
+            continue
+        return candidate
+    return None
+
+
+def _sniff_encoding(body: bytes) -> str:
+    """Guess the charset of a page that declares none: UTF-8 if it decodes"""
+    try:
+        # Not final, so a body cut off by max_bytes mid-character still passes
+        codecs.getincrementaldecoder('utf-8')().decode(body)
+    except UnicodeDecodeError:
+        return 'windows-1252'
+    return 'utf-8'
+
+
+class _LxmlBackend:
+    """Tree access on raw lxml.html elements via XPath"""
+
+    @staticmethod
+    def precompile(selector: str, limit: Optional[int] = None) -> None:
+        _compile_xpath(selector, limit=limit)
+        if limit is None:
+            _compile_xpath(selector, 'descendant-or-self::')
+
+    @staticmethod
+    def parse(chunks: Iterable[bytes], encoding: Optional[str] = None,
+              selector: Optional[str] = None):
+        chunks = iter(chunks)
+        head = b''
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= ENCODING_SNIFF_BYTES:
+                break
+        encoding = _declared_encoding(head, encoding)
+        if encoding is None:
+            # libxml2 would assume Latin-1; check the whole body for UTF-8
+            # instead, as bs4 does
+            head += b''.join(chunks)
+            encoding = _sniff_encoding(head)
+
+        decode = None
+        try:
+            parser = lxml.html.HTMLParser(encoding=encoding)
+        except LookupError:
+            # A charset Python knows but libxml2 doesn't (e.g. euc_jp)
+            parser = lxml.html.HTMLParser()
+            decode = codecs.getincrementaldecoder(encoding)('replace').decode
+
+        # Feeding chunks as they arrive overlaps parsing with the download
+        # and avoids buffering the whole body first
+        for chunk in itertools.chain((head,), chunks):
+            if chunk:
+                parser.feed(decode(chunk) if decode else chunk)
+        root = parser.close()
+        if root is None:
+            raise lxml.etree.ParserError("Document is empty")
+        return root
+
+    @staticmethod
+    def iter_matches(node, selector: str):
+        return iter(_compile_xpath(selector, 'descendant-or-self::')(node))
+
+    @staticmethod
+    def compile(selector: str, limit: Optional[int] = None):
+        # A compiled XPath is already a callable returning the match list
+        return _compile_xpath(selector, limit=limit)
+
+    @staticmethod
+    def find(node, tag: str):
+        return node.find(f'.//{tag}')
+
+    @staticmethod
+    def text(node, max_length: Optional[int] = None) -> str:
+        if len(node) == 0:
+            # Leaf elements (most <h2>, <time>, <a>) hold all their text in
+            # .text, so skip the string() evaluation behind text_content()
+            return _clean_text(node.text or '', max_length)
+        if max_length is None:
+            return _clean_text(node.text_content())
+        # Serialize the text straight to UTF-8 and only decode the prefix we
+        # keep, instead of building a str for the whole paragraph (4 bytes is
+        # the widest UTF-8 character)
+        raw = lxml.etree.tostring(node, method='text', encoding='utf-8', with_tail=False)
+        text = _clean_text(raw[:max_length * 4].decode('utf-8', 'ignore'))
+        if len(text) < max_length and len(raw) > max_length * 4:
+            # Collapsing indentation left the prefix short; use the whole text
+            text = _clean_text(raw.decode('utf-8'))
+        return _clean_text(text, max_length)
+
+    @staticmethod
+    def attr(node, name: str) -> Optional[str]:
+        return node.get(name)
+
+    @staticmethod
+    def tag_name(node) -> str:
+        return node.tag
+
+
+class _SoupBackend:
+    """Tree access on BeautifulSoup tags via soupsieve (fallback parser)"""
+
+    @staticmethod
+    def precompile(selector: str, limit: Optional[int] = None) -> None:
+        _compile_selector(selector)
+
+    @staticmethod
+    def parse(chunks: Iterable[bytes], encoding: Optional[str] = None,
+              selector: Optional[str] = None):
+        # Only build tags for the article cards (and their contents) when the
+        # selector allows it; headers, nav and scripts never become Tags
+        strainer = _article_strainer(selector) if selector else None
+        return BeautifulSoup(b''.join(chunks), 'lxml', from_encoding=encoding,
+                             parse_only=strainer)
+
+    @staticmethod
+    def iter_matches(node, selector: str):
+        # iselect walks the tree lazily, so callers can stop early
+        return _compile_selector(selector).iselect(node)
+
+    @staticmethod
+    def compile(selector: str, limit: Optional[int] = None):
+        return functools.partial(_compile_selector(selector).select, limit=limit or 0)
+
+    @staticmethod
+    def find(node, tag: str):
+        # Plain tag-name search, without the CSS matching machinery
+        return node.find(tag)
+
+    @staticmethod
+    def text(node, max_length: Optional[int] = None) -> str:
+        # .string is O(1) when the tag wraps a single text node, which is the
+        # common case for <h2>, <time> and <a>; get_text walks the subtree
+        string = node.string
+        if type(string) is NavigableString:
+            return _clean_text(string, max_length)
+        return _clean_text(node.get_text(), max_length)
+
+    @staticmethod
+    def attr(node, name: str) -> Optional[str]:
+        return node.get(name)
+
+    @staticmethod
+    def tag_name(node) -> str:
+        return node.name
+
+
+class _SelectolaxBackend:
+    """Tree access on selectolax nodes backed by the Lexbor HTML5 engine"""
+
+    @staticmethod
+    def precompile(selector: str, limit: Optional[int] = None) -> None:
+        # Lexbor compiles selectors internally per query; nothing to cache
+        pass
+
+    @staticmethod
+    def parse(chunks: Iterable[bytes], encoding: Optional[str] = None,
+              selector: Optional[str] = None):
+        body = b''.join(chunks)
+        # Lexbor only understands UTF-8 input, so decode ourselves with the
+        # charset from the header or <meta>, sniffed when neither has one
+        encoding = (_declared_encoding(body[:ENCODING_SNIFF_BYTES], encoding)
+                    or _sniff_encoding(body))
+        return LexborHTMLParser(body.decode(encoding, 'replace'))
+
+    @staticmethod
+    def iter_matches(node, selector: str):
+        return iter(node.css(selector))
+
+    @staticmethod
+    def compile(selector: str, limit: Optional[int] = None):
+        # css_first() runs the full css() query too, so slicing costs nothing
+        return lambda node: node.css(selector)[:limit]
+
+    @staticmethod
+    def find(node, tag: str):
+        return node.css_first(tag)
+
+    @staticmethod
+    def text(node, max_length: Optional[int] = None) -> str:
+        return _clean_text(node.text(), max_length)
+
+    @staticmethod
+    def attr(node, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+    @staticmethod
+    def tag_name(node) -> str:
+        return node.tag
+
+
+PARSER_BACKENDS = {
+    'lxml': _LxmlBackend,
+    'bs4': _SoupBackend,
+}
+if LexborHTMLParser is not None:
+    PARSER_BACKENDS['selectolax'] = _SelectolaxBackend
+
+
+class _HostThrottle:
+    """Caps concurrent fetches and spaces out requests to the same host"""
+
+    def __init__(self, max_concurrency: int, delay: float):
+        """Create the limiter inside the event loop that will use it"""
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.delay = delay
+        self.host_locks = defaultdict(asyncio.Lock)
+        self.next_allowed = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str):
+        """Hold one request slot for url, waiting out the host's delay first"""
+        loop = asyncio.get_running_loop()
+        host = urlparse(url).netloc
+
+        async with self.host_locks[host]:
+            wait = self.next_allowed.get(host, 0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                async with self.semaphore:
+                    yield
+            finally:
+                self.next_allowed[host] = max(
+                    self.next_allowed.get(host, 0),
+                    loop.time() + self.delay
+                )
+
+    def back_off(self, url: str, delay: float):
+        """Hold off further requests to url's host for at least delay seconds"""
+        host = urlparse(url).netloc
+        self.next_allowed[host] = asyncio.get_running_loop().time() + delay
+
+
+class HTTPCache:
+    """On-disk cache of page bodies revalidated with conditional GETs
+
+    Alongside each body it keeps the articles last extracted from it, so a
+    page that is still fresh, answered with 304, or re-sent byte-for-byte
+    does not have to be parsed again.
+    """
+
+    def __init__(self, index_path: Path, body_dir: Path):
+        """Load the cache index, creating the body directory if needed"""
+        self.index_path = Path(index_path)
+        self.body_dir = Path(body_dir)
+        self.body_dir.mkdir(parents=True, exist_ok=True)
+        self.entries = self._load_index()
+
+    def _load_index(self) -> Dict:
+        """Load the URL -> validator index from disk"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                return loads_json(f.read())
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Ignoring corrupt HTTP cache index {self.index_path}: {e}")
+            return {}
+
+    def _entry(self, url: str) -> Optional[Dict]:
+        """Return the index entry for url if its body is still on disk"""
+        entry = self.entries.get(url)
+        if not entry or not Path(entry['cached_path']).exists():
+            return None
+        return entry
+
+    def is_fresh(self, url: str, max_age: float) -> bool:
+        """Whether url was fetched or revalidated less than max_age seconds ago"""
+        entry = self._entry(url)
+        return entry is not None and time.time() - entry.get('fetched_at', 0) < max_age
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return If-None-Match/If-Modified-Since headers for a cached URL"""
+        entry = self._entry(url)
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, url: str):
+        """Return the cached body and charset for a fresh or 304 URL"""
+        entry = self.entries[url]
+        return Path(entry['cached_path']).read_bytes(), entry.get('encoding')
+
+    def touch(self, url: str) -> None:
+        """Restart the freshness window of a URL the server answered with 304"""
+        self.entries[url]['fetched_at'] = time.time()
+
+    def store(self, url: str, content: bytes, encoding: Optional[str], headers) -> None:
+        """Cache a 200 response body together with its validators"""
+        digest = hashlib.sha256(content).hexdigest()
+        cached_path = self.body_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.html"
+        entry = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'encoding': encoding,
+            'html_sha256': digest,
+            'cached_path': str(cached_path),
+            'fetched_at': time.time()
+        }
+
+        previous = self._entry(url)
+        if previous and previous.get('html_sha256') == digest:
+            # Same bytes as last time: keep the file and the articles
+            # already extracted from it
+            if 'articles' in previous:
+                entry['articles_key'] = previous['articles_key']
+                entry['articles'] = previous['articles']
+        else:
+            cached_path.write_bytes(content)
+        self.entries[url] = entry
+
+    def articles(self, url: str, key: str) -> Optional[List[Dict]]:
+        """Articles extracted from the cached body with the same settings, if any"""
+        entry = self.entries.get(url)
+        if entry and entry.get('articles_key') == key:
+            return entry['articles']
+        return None
+
+    def store_articles(self, url: str, key: str, articles: List[Dict]) -> None:
+        """Remember the articles extracted from the cached body of url"""
+        entry = self.entries.get(url)
+        if entry is not None:
+            entry['articles_key'] = key
+            entry['articles'] = articles
+
+    def discard(self, url: str) -> None:
+        """Forget a URL, e.g. because only part of its body was read"""
+        self.entries.pop(url, None)
+
+    def save(self) -> None:
+        """Persist the index so validators survive between runs"""
+        save_json_file(self.entries, self.index_path)
+
+
+class SeenArticles:
+    """Persistent set of articles already returned by earlier scrapes
+
+    Only a short BLAKE2b digest of each competitor and article key (see
+    utils.article_key) is kept, appended to a flat binary file.
+    """
+
+    def __init__(self, path: Path):
+        """Load the digests recorded by earlier runs"""
+        self.path = Path(path)
+        self.digests = self._load()
+        self.pending = []
+
+    def _load(self) -> set:
+        """Read the fixed-size digests back from disk"""
+        try:
+            raw = self.path.read_bytes()
+        except FileNotFoundError:
+            return set()
+        # Ignore a trailing partial digest left by an interrupted write
+        end = len(raw) - len(raw) % SEEN_DIGEST_SIZE
+        return {raw[i:i + SEEN_DIGEST_SIZE] for i in range(0, end, SEEN_DIGEST_SIZE)}
+
+    def add(self, competitor: str, article: Dict) -> bool:
+        """Record an article, returning False if it had been seen before"""
+        digest = hashlib.blake2b(
+            f"{competitor}\n{article_key(article)}".encode(), digest_size=SEEN_DIGEST_SIZE
+        ).digest()
+        if digest in self.digests:
+            return False
+        self.digests.add(digest)
+        self.pending.append(digest)
+        return True
+
+    def save(self) -> None:
+        """Append the digests recorded since the last save"""
+        if self.pending:
+            with open(self.path, 'ab') as f:
+                f.write(b''.join(self.pending))
+            self.pending = []
+
+
+def _parse_page(backend, chunks: Iterable[bytes], competitor: Dict,
+                encoding: Optional[str], max_articles: int) -> List[Dict]:
+    """Parse a page from its body chunks and extract up to max_articles articles
+
+    A module-level function taking the backend class explicitly, so that it
+    can be shipped to a worker process.
+    """
+    selector = competitor.get('selector', DEFAULT_ARTICLE_SELECTOR)
+    try:
+        root = backend.parse(chunks, encoding, selector)
+    except lxml.etree.LxmlError as e:
+        logger.warning(f"Could not parse page for {competitor.get('name')}: {e}")
+        return []
+
+    try:
+        extract_article_data = _article_extractor(backend, competitor)
+    except Exception as e:
+        logger.warning(f"Invalid selector for {competitor.get('name')}: {e}")
+        return []
+
+    articles = []
+    seen_keys = set()
+    # One traversal for the whole comma-joined selector, stopping as soon
+    # as enough unique articles are found
+    for article in backend.iter_matches(root, selector):
+        article_data = extract_article_data(article, seen_keys)
+        if not article_data:
+            continue
+        articles.append(article_data)
+
+        if len(articles) >= max_articles:
+            break
+
+    return articles
+
+
+def _article_extractor(backend, competitor: Dict):
+    """Build the function that extracts one article element's data
+
+    Selectors are resolved and compiled, and backend methods looked up, once
+    per page; the per-article code then only reads local variables.
+    """
+    base_url = competitor.get('url')
+    href_pattern = competitor.get('article_href_pattern')
+    search_href = _compile_pattern(href_pattern).search if href_pattern else None
+    select_anchors = backend.compile(HREF_SELECTOR)
+    select_title = backend.compile(
+        competitor.get('title_selector', DEFAULT_TITLE_SELECTOR), 1
+    )
+    select_date = backend.compile(
+        competitor.get('date_selector', DEFAULT_DATE_SELECTOR), 1
+    )
+    select_content = backend.compile(
+        competitor.get('content_selector', DEFAULT_CONTENT_SELECTOR),
+        CONTENT_PREVIEW_ELEMENTS
+    )
+    find, text, attr, tag_name = backend.find, backend.text, backend.attr, backend.tag_name
+
+    def extract_article_data(article_element,
+                             seen_keys: Optional[set] = None) -> Optional[Dict]:
+        """Extract data from a single article element
+
+        Articles whose key is already in seen_keys are skipped as soon as
+        their title and link are known, before the date and content lookups.
+        """
+        try:
+            # Cards without an article-looking link are navigation or footer
+            # chrome; reject them before running any other selector
+            link = None
+            if search_href is not None:
+                for anchor in select_anchors(article_element):
+                    href = attr(anchor, 'href')
+                    if href and search_href(href):
+                        link = href
+                        break
+                if link is None:
+                    return None
+
+            # Extract title
+            title_elems = select_title(article_element)
+            title = text(title_elems[0]) if title_elems else None
+            if not title:  # Only return if we at least have a title
+                return None
+
+            # Extract link. A link matching article_href_pattern, the title
+            # anchor itself (e.g. a[href*='/blog/'] title selectors) or an
+            # anchor inside the title is the article's own; the card's first
+            # anchor may be a category link instead
+            permalink = link is not None
+            if link is None:
+                if tag_name(title_elems[0]) == 'a':
+                    link_elem = title_elems[0]
+                else:
+                    link_elem = find(title_elems[0], LINK_SELECTOR)
+                permalink = link_elem is not None
+                if link_elem is None:
+                    link_elem = find(article_element, LINK_SELECTOR)
+                link = attr(link_elem, 'href') if link_elem is not None else None
+            if link and not link.startswith('http'):
+                link = _join(base_url, link)
+            permalink = permalink and bool(link)
+
+            # Nested matches (e.g. a post card inside a matching wrapper)
+            # often yield the same article twice
+            if seen_keys is not None:
+                key = dedup_key(title, link if permalink else None)
+                if key in seen_keys:
+                    return None
+                seen_keys.add(key)
+
+            # Extract date
+            date_elems = select_date(article_element)
+            date = None
+            if date_elems:
+                date = attr(date_elems[0], 'datetime') or text(date_elems[0])
+
+            # Extract content preview
+            content = ' '.join([
+                text(elem, MAX_CONTENT_LENGTH) for elem in select_content(article_element)
+            ])
+
+            return {
+                'title': title,
+                'date': date,
+                'content_preview': content[:MAX_CONTENT_LENGTH] if content else None,
+                'link': link,
+                'permalink': permalink
+            }
+        except Exception as e:
+            logger.debug(f"Error extracting article data: {e}")
+
+        return None
+
+    return extract_article_data
+
 
 class CompetitorScraper:
     """Web scraper for AI competitor websites"""
@@ -31,14 +702,54 @@ class CompetitorScraper:
         """Initialize scraper with configuration"""
         self.config = self._load_config(config_path)
         self.session = self._create_session()
+        self.backend = self._get_backend()
+        self._precompile_selectors()
         self.data_dir = Path("data/raw")
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._parse_pool = None
+        self._parse_pool_broken = False
+        self.http_cache = None
+        if self.config.get('http_cache', True):
+            self.http_cache = HTTPCache(Path("data/http_cache.json"), Path("data/http_cache"))
+        self.seen_articles = None
+        if self.config.get('skip_seen_articles', False):
+            self.seen_articles = SeenArticles(Path("data/.seen"))
+            # Results are saved by scrape_all; this covers direct
+            # scrape_website callers
+            atexit.register(self.seen_articles.save)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Release pooled HTTP connections and parser worker processes"""
+        self.session.close()
+        self._shutdown_parse_pool()
+
+    def _get_parse_pool(self) -> Optional[concurrent.futures.ProcessPoolExecutor]:
+        """Worker processes for parsing, started on first use
+
+        Only used when parse_workers is above 1; otherwise (or once the pool
+        has broken) this returns None and pages are parsed on a thread.
+        """
+        workers = self.config.get('parse_workers') or 1
+        if self._parse_pool is None and workers > 1 and not self._parse_pool_broken:
+            self._parse_pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        return self._parse_pool
+
+    def _shutdown_parse_pool(self):
+        """Stop the parse workers, if any were started"""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
 
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from JSON file"""
         try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
+            return load_config(config_path)
         except FileNotFoundError:
             logger.warning(f"Config file {config_path} not found. Using defaults.")
             return self._get_default_config()
@@ -50,17 +761,50 @@ class CompetitorScraper:
                 {
                     "name": "OpenAI",
                     "url": "https://openai.com/blog",
-                    "selector": "article",
-                    "title_selector": "h2, h3",
-                    "date_selector": "time",
-                    "content_selector": "p"
+                    "selector": DEFAULT_ARTICLE_SELECTOR,
+                    "title_selector": DEFAULT_TITLE_SELECTOR,
+                    "date_selector": DEFAULT_DATE_SELECTOR,
+                    "content_selector": DEFAULT_CONTENT_SELECTOR
                 }
             ],
             "request_timeout": 30,
             "rate_limit_delay": 2,
-            "user_agent": "AI-Competitor-Tracker/1.0"
+            "user_agent": "AI-Competitor-Tracker/1.0",
+            "parser": DEFAULT_PARSER
         }
 
+    def _get_backend(self):
+        """Resolve the configured HTML parser backend"""
+        parser = self.config.get('parser', DEFAULT_PARSER)
+        if parser not in PARSER_BACKENDS:
+            logger.warning(f"Parser '{parser}' is not available. Using {DEFAULT_PARSER}.")
+            parser = DEFAULT_PARSER
+        return PARSER_BACKENDS[parser]
+
+    def _precompile_selectors(self):
+        """Compile every configured selector up front
+
+        Later lookups hit the compiled-selector caches, and a broken selector
+        is reported once here instead of silently failing on every article.
+        """
+        fields = (
+            ('selector', DEFAULT_ARTICLE_SELECTOR, None),
+            ('title_selector', DEFAULT_TITLE_SELECTOR, 1),
+            ('date_selector', DEFAULT_DATE_SELECTOR, 1),
+            ('content_selector', DEFAULT_CONTENT_SELECTOR, CONTENT_PREVIEW_ELEMENTS),
+        )
+        self.backend.precompile(HREF_SELECTOR)
+
+        for competitor in self.config.get('competitors', []):
+            for key, default, limit in fields:
+                selector = competitor.get(key, default)
+                try:
+                    self.backend.precompile(selector, limit)
+                except Exception as e:
+                    logger.warning(
+                        f"Invalid {key} for {competitor.get('name')}: {selector!r} ({e})"
+                    )
+
     def _create_session(self) -> requests.Session:
         """Create requests session with retry logic"""
         session = requests.Session()
@@ -69,9 +813,17 @@ class CompetitorScraper:
             read=3,
             connect=3,
             backoff_factor=0.3,
-            status_forcelist=(500, 502, 504)
+            status_forcelist=RETRY_STATUSES
+        )
+        # Keep connections alive so repeated scrapes of the same site reuse
+        # the TCP/TLS connection; with pool_block=False a burst beyond the
+        # pool opens extra connections instead of waiting for a free one
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            pool_block=False
         )
-        adapter = HTTPAdapter(max_retries=retry)
         session.mount('http://', adapter)
         session.mount('https://', adapter)
         session.headers.update({
@@ -87,114 +839,379 @@ class CompetitorScraper:
         logger.info(f"Scraping {name}: {url}")
 
         try:
+            if self._is_fresh(url):
+                logger.info(f"Using cached copy of {url}")
+                return self._build_result(competitor, self._parse_cached(url, competitor))
+
             response = self.session.get(
                 url,
-                timeout=self.config.get('request_timeout', 30)
+                headers=self._conditional_headers(url),
+                timeout=self.config.get('request_timeout', 30),
+                stream=True
             )
-            response.raise_for_status()
+            with response:
+                response.raise_for_status()
+                if response.status_code == 304 and self.http_cache is not None:
+                    logger.info(f"Not modified since last scrape: {url}")
+                    self.http_cache.touch(url)
+                    articles = self._parse_cached(url, competitor)
+                else:
+                    encoding = self._declared_encoding(response)
+                    chunks = self._stream_body(url, response, encoding)
+                    articles = self._parse_articles(chunks, competitor, encoding)
+                    self._remember_articles(url, competitor, articles)
+        except requests.RequestException as e:
+            return self._build_error(competitor, e)
+        finally:
+            self._save_http_cache()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+        return self._build_result(competitor, articles)
 
-            # Extract articles/posts
-            articles = []
-            article_elements = soup.select(competitor.get('selector', 'article'))
+    def _stream_body(self, url: str, response: requests.Response,
+                     encoding: Optional[str]) -> Iterator[bytes]:
+        """Yield the body as it arrives, up to max_bytes, caching it once read"""
+        keep = self.http_cache is not None
+        max_bytes = self.config.get('max_bytes', DEFAULT_MAX_BYTES)
+        chunks = []
+        total = 0
 
-            for article in article_elements[:10]:  # Limit to 10 most recent
-                article_data = self._extract_article_data(article, competitor)
-                if article_data:
-                    articles.append(article_data)
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            total += len(chunk)
+            if total > max_bytes:
+                # Stop reading; closing the response drops the rest unread
+                logger.info(f"Truncated {url} at {max_bytes} bytes")
+                yield chunk[:len(chunk) - (total - max_bytes)]
+                if self.http_cache is not None:
+                    self.http_cache.discard(url)
+                return
+            if keep:
+                chunks.append(chunk)
+            yield chunk
 
-            result = {
-                'competitor': name,
-                'url': url,
-                'timestamp': datetime.now().isoformat(),
-                'articles': articles,
-                'article_count': len(articles)
-            }
+        if self.http_cache is not None:
+            self.http_cache.store(url, b''.join(chunks), encoding, response.headers)
 
-            logger.info(f"Successfully scraped {len(articles)} articles from {name}")
-            return result
+    async def scrape_website_async(self, session: aiohttp.ClientSession,
+                                   competitor: Dict, throttle: _HostThrottle,
+                                   timestamp: Optional[str] = None) -> Dict:
+        """Scrape a single competitor website on a shared aiohttp session"""
+        name = competitor.get('name')
+        url = competitor.get('url')
 
-        except requests.RequestException as e:
-            logger.error(f"Error scraping {name}: {e}")
-            return {
-                'competitor': name,
-                'url': url,
-                'timestamp': datetime.now().isoformat(),
-                'error': str(e),
-                'articles': []
-            }
+        logger.info(f"Scraping {name}: {url}")
 
-    def _extract_article_data(self, article_element, competitor: Dict) -> Optional[Dict]:
-        """Extract data from a single article element"""
+        content = encoding = None
         try:
-            # Extract title
-            title_elem = article_element.select_one(competitor.get('title_selector', 'h2, h3'))
-            title = title_elem.get_text(strip=True) if title_elem else None
+            if self._is_fresh(url):
+                logger.info(f"Using cached copy of {url}")
+            else:
+                content, encoding = await self._fetch(session, url, throttle)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return self._build_error(competitor, e, timestamp)
 
-            # Extract date
-            date_elem = article_element.select_one(competitor.get('date_selector', 'time'))
-            date = date_elem.get('datetime', date_elem.get_text(strip=True)) if date_elem else None
+        articles = self._cached_articles(url, competitor)
+        if articles is None:
+            if content is None:
+                content, encoding = self.http_cache.load(url)
+            articles = await self._parse_async(content, competitor, encoding)
+            self._remember_articles(url, competitor, articles)
+        return self._build_result(competitor, articles, timestamp)
 
-            # Extract content preview
-            content_elems = article_element.select(competitor.get('content_selector', 'p'))
-            content = ' '.join([elem.get_text(strip=True) for elem in content_elems[:3]])
+    async def _fetch(self, session: aiohttp.ClientSession, url: str,
+                     throttle: _HostThrottle):
+        """Download a page, returning its body and declared charset"""
+        for attempt in range(MAX_FETCH_RETRIES + 1):
+            async with throttle.slot(url):
+                async with session.get(url, headers=self._conditional_headers(url)) as response:
+                    if response.status in RETRY_STATUSES and attempt < MAX_FETCH_RETRIES:
+                        delay = self._retry_delay(response.headers, attempt)
+                        logger.warning(
+                            f"HTTP {response.status} from {url}, retrying in {delay:.1f}s"
+                        )
+                        throttle.back_off(url, delay)
+                        continue
 
-            # Extract link
-            link_elem = article_element.select_one('a')
-            link = link_elem.get('href') if link_elem else None
-            if link and not link.startswith('http'):
-                link = urljoin(competitor['url'], link)
-
-            if title:  # Only return if we at least have a title
-                return {
-                    'title': title,
-                    'date': date,
-                    'content_preview': content[:500] if content else None,
-                    'link': link
-                }
-        except Exception as e:
-            logger.debug(f"Error extracting article data: {e}")
+                    response.raise_for_status()
+                    content, truncated = await self._read_body(url, response)
+                    return self._cached_body(
+                        url,
+                        response.status,
+                        content,
+                        response.charset,
+                        response.headers,
+                        truncated
+                    )
+
+    async def _read_body(self, url: str,
+                         response: aiohttp.ClientResponse) -> Tuple[bytes, bool]:
+        """Read a body up to max_bytes, returning it and whether it was cut short"""
+        max_bytes = self.config.get('max_bytes', DEFAULT_MAX_BYTES)
+        chunks = []
+        total = 0
+
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total > max_bytes:
+                logger.info(f"Truncated {url} at {max_bytes} bytes")
+                return b''.join(chunks)[:max_bytes], True
+
+        return b''.join(chunks), False
+
+    @staticmethod
+    def _retry_delay(headers, attempt: int) -> float:
+        """Seconds to wait before retrying, honouring Retry-After if present"""
+        retry_after = headers.get('Retry-After')
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = retry_at.timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0), MAX_RETRY_DELAY)
+
+        # Exponential backoff, matching the requests session's Retry policy
+        return min(0.5 * 2 ** attempt, MAX_RETRY_DELAY)
+
+    def _is_fresh(self, url: str) -> bool:
+        """Whether the cached copy of url can be used without any request"""
+        if self.http_cache is None:
+            return False
+        max_age = self.config.get('http_cache_expire_after', DEFAULT_CACHE_EXPIRE_AFTER)
+        return self.http_cache.is_fresh(url, max_age)
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """Validators for revalidating a cached page, if any"""
+        if self.http_cache is None:
+            return {}
+        return self.http_cache.conditional_headers(url)
 
+    def _cached_body(self, url: str, status: int, content: bytes,
+                     encoding: Optional[str], headers, truncated: bool = False):
+        """Resolve a response to the page body, serving 304s from the cache"""
+        if self.http_cache is None:
+            return content, encoding
+        if status == 304:
+            logger.info(f"Not modified since last scrape: {url}")
+            self.http_cache.touch(url)
+            return self.http_cache.load(url)
+        if truncated:
+            # A partial body must not be served later as the whole page
+            self.http_cache.discard(url)
+        else:
+            self.http_cache.store(url, content, encoding, headers)
+        return content, encoding
+
+    def _extraction_key(self, competitor: Dict) -> str:
+        """Fingerprint of the settings that decide which articles a page yields"""
+        settings = [competitor.get(key) for key in EXTRACTION_SETTINGS]
+        settings += [self.config.get('max_articles_per_site', 10), self.backend.__name__]
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def _cached_articles(self, url: str, competitor: Dict) -> Optional[List[Dict]]:
+        """Articles already extracted from the cached body of url, if still valid"""
+        if self.http_cache is None:
+            return None
+        return self.http_cache.articles(url, self._extraction_key(competitor))
+
+    def _remember_articles(self, url: str, competitor: Dict, articles: List[Dict]):
+        """Keep the articles next to the cached body they were extracted from"""
+        if self.http_cache is not None:
+            self.http_cache.store_articles(url, self._extraction_key(competitor), articles)
+
+    def _parse_cached(self, url: str, competitor: Dict) -> List[Dict]:
+        """Articles from the cached copy of url, parsing it only if needed"""
+        articles = self._cached_articles(url, competitor)
+        if articles is None:
+            content, encoding = self.http_cache.load(url)
+            articles = self._parse_articles((content,), competitor, encoding)
+            self._remember_articles(url, competitor, articles)
+        return articles
+
+    def _save_http_cache(self):
+        """Persist cache validators collected during a scrape"""
+        if self.http_cache is not None:
+            self.http_cache.save()
+
+    async def _parse_async(self, content: bytes, competitor: Dict,
+                           encoding: Optional[str]) -> List[Dict]:
+        """Parse a page off the event loop, so other downloads keep going
+
+        Pages go to the worker processes when parse_workers asks for them,
+        and otherwise to a worker thread (lxml releases the GIL while
+        parsing).
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_parse_pool()
+        if pool is not None:
+            try:
+                return await loop.run_in_executor(
+                    pool, _parse_page, self.backend, (content,), competitor, encoding,
+                    self.config.get('max_articles_per_site', 10)
+                )
+            except concurrent.futures.process.BrokenProcessPool as e:
+                # Workers that crashed or could not start (e.g. spawned from a
+                # script without an if __name__ == "__main__" guard)
+                logger.warning(f"Parse workers unavailable, parsing in process: {e}")
+                self._parse_pool_broken = True
+                if self._parse_pool is pool:
+                    self._parse_pool = None
+                pool.shutdown(wait=False)
+
+        return await loop.run_in_executor(
+            None, self._parse_articles, (content,), competitor, encoding
+        )
+
+    def _parse_articles(self, chunks: Iterable[bytes], competitor: Dict,
+                        encoding: Optional[str] = None) -> List[Dict]:
+        """Parse a page from its body chunks and extract its articles"""
+        return _parse_page(self.backend, chunks, competitor, encoding,
+                           self.config.get('max_articles_per_site', 10))
+
+    def _build_result(self, competitor: Dict, articles: List[Dict],
+                      timestamp: Optional[str] = None) -> Dict:
+        """Wrap extracted articles into a scraping result
+
+        timestamp is the ISO time of the scrape run, taken now if not given.
+        With skip_seen_articles, articles returned by earlier scrapes are
+        left out.
+        """
+        name = competitor.get('name')
+        if self.seen_articles is not None:
+            articles = [
+                article for article in articles
+                if self.seen_articles.add(name, article)
+            ]
+        logger.info(f"Successfully scraped {len(articles)} articles from {name}")
+        return {
+            'competitor': name,
+            'url': competitor.get('url'),
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'articles': articles,
+            'article_count': len(articles)
+        }
+
+    def _build_error(self, competitor: Dict, error: Exception,
+                     timestamp: Optional[str] = None) -> Dict:
+        """Build the result recorded for a failed scrape"""
+        # Timeouts stringify to an empty message, so fall back to the repr
+        message = str(error) or repr(error)
+        logger.error(f"Error scraping {competitor.get('name')}: {message}")
+        return {
+            'competitor': competitor.get('name'),
+            'url': competitor.get('url'),
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'error': message,
+            'articles': []
+        }
+
+    @staticmethod
+    def _declared_encoding(response: requests.Response) -> Optional[str]:
+        """Return the charset declared in the Content-Type header, if any"""
+        # requests falls back to ISO-8859-1 for text/* without a charset, so
+        # only trust response.encoding when the server actually declared one
+        if 'charset' in response.headers.get('Content-Type', '').lower():
+            return response.encoding
         return None
 
     def scrape_all(self) -> List[Dict]:
         """Scrape all configured competitor websites"""
-        results = []
+        # One timestamp for the whole run, shared by every result
+        try:
+            results = asyncio.run(self.scrape_all_async(datetime.now().isoformat()))
+        finally:
+            # Scheduled runs are a day apart; don't keep idle workers around
+            self._shutdown_parse_pool()
 
-        for competitor in self.config.get('competitors', []):
-            result = self.scrape_website(competitor)
-            if result:
-                results.append(result)
-                # Save individual result
-                self._save_result(result)
-                # Rate limiting
-                time.sleep(self.config.get('rate_limit_delay', 2))
+        for result in results:
+            # Save individual result
+            self._save_result(result)
+
+        if self.seen_articles is not None:
+            self.seen_articles.save()
+
+        return results
+
+    async def scrape_all_async(self, timestamp: Optional[str] = None) -> List[Dict]:
+        """Scrape all configured competitor websites concurrently"""
+        if timestamp is None:
+            timestamp = datetime.now().isoformat()
+        timeout = aiohttp.ClientTimeout(total=self.config.get('request_timeout', 30))
+        headers = {
+            'User-Agent': self.config.get('user_agent', 'AI-Competitor-Tracker/1.0')
+        }
+
+        connector = aiohttp.TCPConnector(limit=POOL_MAXSIZE, limit_per_host=4)
+        throttle = _HostThrottle(
+            self.config.get('max_concurrency', 16),
+            self.config.get('rate_limit_delay', 2)
+        )
+        competitors = self.config.get('competitors', [])
 
+        try:
+            async with aiohttp.ClientSession(headers=headers, timeout=timeout,
+                                             connector=connector) as session:
+                outcomes = await asyncio.gather(
+                    *[self.scrape_website_async(session, competitor, throttle, timestamp)
+                      for competitor in competitors],
+                    return_exceptions=True
+                )
+        finally:
+            self._save_http_cache()
+
+        # One competitor failing unexpectedly must not discard the others
+        results = []
+        for competitor, outcome in zip(competitors, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = self._build_error(competitor, outcome, timestamp)
+            results.append(outcome)
         return results
 
     def _save_result(self, result: Dict):
-        """Save scraping result to JSON file"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        """Append scraping result to the competitor's JSON Lines file"""
         competitor_name = result['competitor'].replace(' ', '_')
-        filename = self.data_dir / f"{competitor_name}_{timestamp}.json"
+        filename = self.data_dir / f"{competitor_name}.jsonl"
 
-        with open(filename, 'w') as f:
-            json.dump(result, f, indent=2, default=str)
-
-        logger.info(f"Saved result to {filename}")
+        if append_json_line(result, filename):
+            logger.info(f"Saved result to {filename}")
 
     def get_latest_data(self, competitor_name: str = None) -> List[Dict]:
-        """Get the latest scraped data"""
+        """Get the latest scraped data (up to 10 results, newest first)"""
         pattern = f"{competitor_name}*" if competitor_name else "*"
-        files = sorted(self.data_dir.glob(f"{pattern}.json"), key=lambda x: x.stat().st_mtime, reverse=True)
 
+        # Results are appended, so the newest are at the end of each file
         data = []
-        for file in files[:10]:  # Get last 10 files
-            with open(file, 'r') as f:
-                data.append(json.load(f))
+        for file in self.data_dir.glob(f"{pattern}.jsonl"):
+            data.extend(read_json_lines(file, last=10))
+
+        # Per-scrape files written before results were appended; get the
+        # last 10, read concurrently
+        files = self._newest_files(self.data_dir.glob(f"{pattern}.json"), 10)
+        data.extend(d for d in load_json_files(files) if d is not None)
+
+        data.sort(key=lambda d: d.get('timestamp') or '', reverse=True)
+        return data[:10]
 
-        return data
+    @staticmethod
+    def _newest_files(files: Iterable[Path], count: int) -> List[Path]:
+        """Return the count most recent result files, newest first
+
+        Uses the timestamp in the filename, which needs no stat() calls;
+        files named some other way fall back to modification times.
+        """
+        files = list(files)
+        stamped = []
+        for file in files:
+            match = RESULT_TIMESTAMP.search(file.name)
+            if match is None:
+                return sorted(files, key=lambda x: x.stat().st_mtime, reverse=True)[:count]
+            stamped.append((match.group(1), file))
+
+        return [file for _, file in heapq.nlargest(count, stamped)]
 
 
 def main():
@@ -203,10 +1220,9 @@ def main():
     print("AI Competitor Tracker - Web Scraper")
     print("=" * 60)
 
-    scraper = CompetitorScraper()
-
-    print("\nStarting competitor website scraping...")
-    results = scraper.scrape_all()
+    with CompetitorScraper() as scraper:
+        print("\nStarting competitor website scraping...")
+        results = scraper.scrape_all()
 
     print(f"\nScraped {len(results)} competitor websites")
 
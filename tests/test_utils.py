@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSON Lines result files in utils.py
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils  # noqa: E402
+
+OLD = '2000-01-01T00:00:00'
+
+
+def result_line(timestamp: str, competitor: str = 'OpenAI') -> str:
+    """One result as append_json_line would write it"""
+    return json.dumps({'competitor': competitor, 'timestamp': timestamp, 'articles': []}) + '\n'
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def json_backend(request, monkeypatch):
+    """Run a test with orjson (if installed) and with the stdlib fallback"""
+    if request.param == 'json':
+        monkeypatch.setattr(utils, 'orjson', None)
+    elif utils.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+def test_prune_drops_damaged_leading_line(tmp_path, json_backend):
+    now = datetime.now().isoformat()
+    path = tmp_path / 'OpenAI.jsonl'
+    path.write_text('{"competitor": "OpenAI", "timest\n' + result_line(OLD) + result_line(now))
+
+    assert utils.clean_old_data(30, str(tmp_path)) == 1
+    assert [r['timestamp'] for r in utils.read_json_lines(path)] == [now]
+    assert path.read_text() == result_line(now)
+
+
+def test_prune_keeps_lines_after_first_recent_result(tmp_path, json_backend):
+    now = datetime.now().isoformat()
+    path = tmp_path / 'OpenAI.jsonl'
+    path.write_text(result_line(OLD) + result_line(now) + '{"damaged\n' + result_line(now))
+
+    assert utils.clean_old_data(30, str(tmp_path)) == 1
+    assert path.read_text() == result_line(now) + '{"damaged\n' + result_line(now)
+
+
+def test_prune_unlinks_file_when_every_line_is_old(tmp_path, json_backend):
+    path = tmp_path / 'OpenAI.jsonl'
+    path.write_text(result_line(OLD) + result_line('2000-01-02T00:00:00'))
+
+    assert utils.clean_old_data(30, str(tmp_path)) == 2
+    assert not path.exists()
+
+
+def test_prune_leaves_recent_file_untouched(tmp_path, json_backend):
+    now = datetime.now().isoformat()
+    path = tmp_path / 'OpenAI.jsonl'
+    path.write_text(result_line(now))
+    mtime = path.stat().st_mtime_ns
+
+    assert utils.clean_old_data(30, str(tmp_path)) == 0
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_clean_handles_legacy_json_and_jsonl_together(tmp_path, json_backend):
+    now = datetime.now().isoformat()
+    jsonl = tmp_path / 'OpenAI.jsonl'
+    jsonl.write_text(result_line(OLD) + result_line(now))
+    old_json = tmp_path / 'OpenAI_20000101_000000.json'
+    old_json.write_text(result_line(OLD))
+    stale = time.time() - 60 * 86400
+    os.utime(old_json, (stale, stale))
+    new_json = tmp_path / 'OpenAI_20990101_000000.json'
+    new_json.write_text(result_line(now))
+    (tmp_path / 'notes.txt').write_text('kept')
+
+    assert utils.clean_old_data(30, str(tmp_path)) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        'OpenAI.jsonl', 'OpenAI_20990101_000000.json', 'notes.txt'
+    ]
+    assert jsonl.read_text() == result_line(now)
+
+
+def test_clean_missing_directory(tmp_path):
+    assert utils.clean_old_data(30, str(tmp_path / 'missing')) == 0
+
+
+def test_append_after_truncated_write(tmp_path, json_backend):
+    path = tmp_path / 'OpenAI.jsonl'
+    path.write_text(result_line(OLD) + '{"competitor": "OpenAI", "timest')
+
+    assert utils.append_json_line({'competitor': 'OpenAI', 'timestamp': 'new'}, path)
+
+    lines = path.read_text().split('\n')
+    assert lines[1] == '{"competitor": "OpenAI", "timest'
+    assert json.loads(lines[2]) == {'competitor': 'OpenAI', 'timestamp': 'new'}
+    assert [r['timestamp'] for r in utils.read_json_lines(path)] == [OLD, 'new']
+
+
+def test_append_creates_file_and_separates_lines(tmp_path, json_backend):
+    path = tmp_path / 'OpenAI.jsonl'
+
+    assert utils.append_json_line({'n': 1}, path)
+    assert utils.append_json_line({'n': 2}, path)
+
+    assert path.read_bytes().count(b'\n') == 2
+    assert utils.read_json_lines(path) == [{'n': 1}, {'n': 2}]
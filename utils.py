@@ -3,15 +3,48 @@
 Utility functions for AI Competitor Tracker
 """
 
+import collections
+import functools
+import io
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from urllib.parse import urlparse
 
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib json module is the fallback
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional; calculate_statistics loads whole files without it
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
+# Threads used to overlap the open/read syscalls of many small data files
+FILE_LOAD_WORKERS = 32
+
+# Formats format_date falls back to when the date is not strict ISO 8601
+# (strptime also accepts unpadded months and days, e.g. 2024-1-5)
+DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S')
+
+# ijson events carrying a JSON scalar value
+SCALAR_EVENTS = ('string', 'number', 'boolean', 'null')
+
+# Shared empty default, so missing keys don't allocate a new list each time
+_EMPTY = ()
+
+# Click-tracking query parameters canonical_url drops, besides utm_*
+TRACKING_PARAMS = frozenset((
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga'
+))
+
 
 def ensure_directories():
     """Ensure all required directories exist"""
@@ -30,74 +63,299 @@ def ensure_directories():
 
 
 def clean_old_data(days: int = 30, data_dir: str = "data/raw"):
-    """Clean data files older than specified days"""
-    data_path = Path(data_dir)
+    """Clean scraping results older than specified days
+
+    Old lines are dropped from the per-competitor .jsonl files; legacy
+    per-scrape .json files are deleted by modification time.
+    """
     cutoff_date = datetime.now() - timedelta(days=days)
+    # Compare raw mtimes against one precomputed timestamp instead of
+    # building a datetime per file
+    cutoff = cutoff_date.timestamp()
 
     deleted_count = 0
-    for file in data_path.glob("*.json"):
-        file_time = datetime.fromtimestamp(file.stat().st_mtime)
-        if file_time < cutoff_date:
-            file.unlink()
-            deleted_count += 1
+    try:
+        entries = os.scandir(data_dir)
+    except FileNotFoundError:
+        return 0
+
+    with entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if entry.name.endswith('.jsonl'):
+                deleted_count += _prune_json_lines(entry.path, cutoff_date.isoformat())
+            elif entry.name.endswith('.json') and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                deleted_count += 1
 
-    logger.info(f"Cleaned {deleted_count} old data files")
+    logger.info(f"Cleaned {deleted_count} old results")
     return deleted_count
 
 
-def validate_url(url: str) -> bool:
-    """Validate if a string is a valid URL"""
-    try:
-        result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except:
+def _prune_json_lines(filepath: str, cutoff: str) -> int:
+    """Drop results timestamped before cutoff from a JSON Lines file
+
+    Results are appended in time order, so only a leading run of lines can
+    be old; unreadable lines within that run are dropped along with them.
+    Returns the number of results removed.
+    """
+    with open(filepath, 'rb') as f:
+        lines = f.readlines()
+
+    old_count = 0
+    keep_from = len(lines)
+    for index, line in enumerate(lines):
+        try:
+            timestamp = loads_json(line).get('timestamp')
+        except (AttributeError, ValueError):
+            # A damaged line, e.g. a write cut short by a crash
+            continue
+        # ISO timestamps in the same format compare chronologically as text
+        if not timestamp or timestamp >= cutoff:
+            keep_from = index
+            break
+        old_count += 1
+
+    if keep_from == len(lines):
+        os.unlink(filepath)
+    elif keep_from:
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.writelines(lines[keep_from:])
+        os.replace(tmp_path, filepath)
+    return old_count
+
+
+def loads_json(raw: bytes) -> Any:
+    """Parse JSON from bytes, with orjson when it is installed"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_config(config_path: str) -> bytes:
+    """Read a configuration file from disk only once per path"""
+    with open(config_path, 'rb') as f:
+        return f.read()
+
+
+def load_config(config_path: str) -> Dict:
+    """Load a JSON configuration file
+
+    The file is read once, but each caller gets its own parsed dict, so
+    changes made by one (e.g. the scheduler's --time) don't leak into
+    another. Raises FileNotFoundError if the file does not exist.
+    """
+    return loads_json(_read_config(config_path))
+
+
+def _split_host(url: str):
+    """Split 'scheme://host/rest' into (scheme, host) with plain str methods"""
+    scheme, separator, rest = url.partition('://')
+    if not separator:
+        return '', ''
+    for delimiter in '/?#':
+        rest = rest.partition(delimiter)[0]
+    return scheme, rest
+
+
+def validate_url(url: str, strict: bool = False) -> bool:
+    """Validate if a string is a valid http(s) URL
+
+    The default check only looks for an http/https scheme and a host; pass
+    strict=True to run the full urlparse, which also accepts other schemes.
+    """
+    if strict:
+        try:
+            result = urlparse(url)
+            return all([result.scheme, result.netloc])
+        except (AttributeError, TypeError, ValueError):
+            return False
+
+    if not isinstance(url, str):
         return False
+    scheme, host = _split_host(url)
+    return scheme.lower() in ('http', 'https') and bool(host)
 
 
 def load_json_file(filepath: str) -> Optional[Dict]:
     """Safely load JSON file"""
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return loads_json(f.read())
     except Exception as e:
         logger.error(f"Error loading JSON file {filepath}: {e}")
         return None
 
 
+def _map_files(func, filepaths: Iterable) -> List:
+    """Apply func to many files concurrently, returning results in order"""
+    filepaths = list(filepaths)
+    if len(filepaths) <= 1:
+        return [func(filepath) for filepath in filepaths]
+
+    with ThreadPoolExecutor(min(FILE_LOAD_WORKERS, len(filepaths))) as executor:
+        return list(executor.map(func, filepaths))
+
+
+def load_json_files(filepaths: Iterable) -> List[Optional[Dict]]:
+    """Load many JSON files concurrently, in order (None for unreadable files)"""
+    return _map_files(load_json_file, filepaths)
+
+
+def read_json_lines(filepath, last: Optional[int] = None) -> List[Dict]:
+    """Load the records of a JSON Lines file, or only its last few
+
+    Unparseable lines (e.g. a write cut short by a crash) are skipped.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            # A bounded deque keeps just the tail while streaming the file
+            lines = collections.deque(f, maxlen=last)
+    except OSError as e:
+        logger.error(f"Error loading JSON Lines file {filepath}: {e}")
+        return []
+
+    records = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            records.append(loads_json(line))
+        except ValueError as e:
+            logger.warning(f"Skipping unreadable line in {filepath}: {e}")
+    return records
+
+
+def append_json_line(data: Dict, filepath) -> bool:
+    """Append data to a JSON Lines file as one compact line"""
+    try:
+        if orjson:
+            line = orjson.dumps(
+                data,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+            )
+        else:
+            line = (json.dumps(data, default=str) + '\n').encode()
+        with open(filepath, 'a+b') as f:
+            # A crash mid-write leaves a partial last line; start a new line
+            # rather than corrupting this result too
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    line = b'\n' + line
+            # A single write per result, so concurrent appends don't interleave
+            f.write(line)
+        return True
+    except Exception as e:
+        logger.error(f"Error appending to JSON Lines file {filepath}: {e}")
+        return False
+
+
 def save_json_file(data: Dict, filepath: str) -> bool:
     """Safely save data to JSON file"""
     try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        if orjson:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(
+                    data,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
+        else:
+            with open(filepath, 'w') as f:
+                json.dump(data, f, indent=2, default=str)
         return True
     except Exception as e:
         logger.error(f"Error saving JSON file {filepath}: {e}")
         return False
 
 
-def extract_domain(url: str) -> str:
-    """Extract domain from URL"""
-    try:
-        parsed = urlparse(url)
-        return parsed.netloc.replace('www.', '')
-    except:
+def extract_domain(url: str, strict: bool = False) -> str:
+    """Extract domain from URL, without a leading 'www.'
+
+    strict=True parses with urlparse instead of plain string splitting.
+    """
+    if not isinstance(url, str):
         return ""
+    if strict:
+        try:
+            host = urlparse(url).netloc
+        except ValueError:
+            return ""
+    else:
+        host = _split_host(url)[1]
 
+    return host[4:] if host.startswith('www.') else host
 
-def format_date(date_str: str) -> str:
-    """Format date string to consistent format"""
+
+def _is_tracking_param(name: str) -> bool:
+    """Whether a query parameter only records where a click came from"""
+    name = name.lower()
+    return name.startswith('utm_') or name in TRACKING_PARAMS
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL for deduplication
+
+    The host is lower-cased and the fragment, trailing slash and tracking
+    parameters (utm_*, fbclid, ...) are dropped. Other query parameters are
+    kept, since some sites tell posts apart only by them (e.g. /?p=123).
+    """
+    parsed = urlparse(url)
+    canonical = f"{parsed.scheme}://{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+    query = '&'.join(
+        param for param in parsed.query.split('&')
+        if param and not _is_tracking_param(param.partition('=')[0])
+    )
+    return f"{canonical}?{query}" if query else canonical
+
+
+def dedup_key(title: Optional[str], link: Optional[str] = None) -> Optional[str]:
+    """Identity of an article: its canonical link, else its normalized title
+
+    Only pass the article's own link (see article_link). A card's first
+    anchor may be a category or javascript: link shared by many posts.
+    """
+    if link:
+        return canonical_url(link)
+    return ' '.join(title.lower().split()) if title else None
+
+
+def article_link(article: Dict) -> Optional[str]:
+    """The link of a scraped article dict, if it is known to be its own"""
+    return article.get('link') if article.get('permalink') else None
+
+
+def article_key(article: Dict) -> Optional[str]:
+    """Identity of a scraped article dict (see dedup_key)"""
+    return dedup_key(article.get('title'), article_link(article))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_prefix(prefix: str) -> Optional[str]:
+    """Normalize a date string prefix to YYYY-MM-DD, or None if unparseable"""
+    # fromisoformat is implemented in C and covers the common case
     try:
-        # Try parsing various date formats
-        for fmt in ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S']:
-            try:
-                date_obj = datetime.strptime(date_str[:19], fmt)
-                return date_obj.strftime('%Y-%m-%d')
-            except:
-                continue
-    except:
+        return datetime.fromisoformat(prefix).strftime('%Y-%m-%d')
+    except ValueError:
         pass
 
-    return date_str
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(prefix, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def format_date(date_str: str) -> str:
+    """Format date string to consistent format"""
+    if not isinstance(date_str, str):
+        return date_str
+    # Article dates repeat a lot across runs, so parse each prefix only once
+    return _parse_date_prefix(date_str[:19]) or date_str
 
 
 def truncate_text(text: str, max_length: int = 500) -> str:
@@ -113,50 +371,144 @@ def truncate_text(text: str, max_length: int = 500) -> str:
 
 def get_recent_files(directory: str, hours: int = 24) -> List[Path]:
     """Get files modified within the last N hours"""
-    dir_path = Path(directory)
-    cutoff_time = datetime.now() - timedelta(hours=hours)
+    cutoff = (datetime.now() - timedelta(hours=hours)).timestamp()
 
+    # Keep each mtime with its path so sorting needs no second stat() call
     recent_files = []
-    for file in dir_path.glob("*"):
-        if file.is_file():
-            file_time = datetime.fromtimestamp(file.stat().st_mtime)
-            if file_time > cutoff_time:
-                recent_files.append(file)
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return []
+
+    with entries:
+        for entry in entries:
+            if entry.is_file():
+                mtime = entry.stat().st_mtime
+                if mtime > cutoff:
+                    recent_files.append((mtime, entry.path))
 
-    return sorted(recent_files, key=lambda x: x.stat().st_mtime, reverse=True)
+    recent_files.sort(reverse=True)
+    return [Path(path) for _, path in recent_files]
 
 
 def merge_competitor_data(data_list: List[Dict]) -> Dict:
     """Merge multiple data entries for the same competitor"""
-    merged = {
-        'articles': [],
-        'timestamps': [],
-        'errors': []
-    }
+    # Dedup in the same pass that collects the articles; the first
+    # occurrence wins. Articles with their own link match on it, so one post
+    # shown under slightly different titles counts once; the others match on
+    # title, including against linked articles with that title.
+    unique_articles = []
+    links = set()
+    titles = set()
+    linkless_titles = set()
+    timestamps = []
+    errors = []
 
     for data in data_list:
-        merged['articles'].extend(data.get('articles', []))
-        merged['timestamps'].append(data.get('timestamp'))
+        for article in data.get('articles', _EMPTY):
+            title = article.get('title')
+            if not title:
+                continue
+            title_key = dedup_key(title)
+            link = article_link(article)
+            if link:
+                link_key = dedup_key(title, link)
+                if link_key in links or title_key in linkless_titles:
+                    continue
+                links.add(link_key)
+            else:
+                if title_key in titles:
+                    continue
+                linkless_titles.add(title_key)
+            titles.add(title_key)
+            unique_articles.append(article)
+        timestamps.append(data.get('timestamp'))
         if 'error' in data:
-            merged['errors'].append(data['error'])
+            errors.append(data['error'])
 
-    # Remove duplicate articles based on title
-    seen_titles = set()
-    unique_articles = []
-    for article in merged['articles']:
-        title = article.get('title')
-        if title and title not in seen_titles:
-            seen_titles.add(title)
-            unique_articles.append(article)
+    return {
+        'articles': unique_articles,
+        'timestamps': timestamps,
+        'errors': errors
+    }
+
+
+def _summarize_result(data: Dict) -> Dict:
+    """The fields calculate_statistics needs from a loaded result"""
+    return {
+        'competitor': data.get('competitor', 'Unknown'),
+        'timestamp': data.get('timestamp'),
+        'article_count': len(data.get('articles', _EMPTY)),
+        'has_error': 'error' in data
+    }
+
+
+def _summarize_events(events) -> Optional[Dict]:
+    """Fold the ijson events of one result into its summary (None if empty)"""
+    summary = {
+        'competitor': 'Unknown',
+        'timestamp': None,
+        'article_count': 0,
+        'has_error': False
+    }
+    has_keys = False
+    for prefix, event, value in events:
+        if prefix:
+            if prefix == 'articles.item' and event == 'start_map':
+                summary['article_count'] += 1
+            elif prefix in ('competitor', 'timestamp') and event in SCALAR_EVENTS:
+                summary[prefix] = value
+        elif event == 'map_key':
+            has_keys = True
+            if value == 'error':
+                summary['has_error'] = True
+    return summary if has_keys else None
+
+
+def summarize_data_file(filepath) -> List[Dict]:
+    """Read only what calculate_statistics needs from a results file
+
+    Returns the competitor, timestamp, article count and whether the scrape
+    failed for each result in the file: every line of a .jsonl file, or the
+    single result of a legacy .json file. Unreadable or empty results are
+    left out. With ijson installed the file is streamed, so article bodies
+    are never materialized.
+    """
+    jsonl = str(filepath).endswith('.jsonl')
+    if ijson is None:
+        records = read_json_lines(filepath) if jsonl else [load_json_file(filepath)]
+        return [_summarize_result(data) for data in records if data]
+
+    summaries = []
+    try:
+        with open(filepath, 'rb') as f:
+            if not jsonl:
+                summary = _summarize_events(ijson.parse(f))
+                return [summary] if summary else []
+
+            # One parser per line, so a damaged line (e.g. a write cut short
+            # by a crash) only loses its own result, as in read_json_lines
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    summary = _summarize_events(ijson.parse(io.BytesIO(line)))
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable line in {filepath}: {e}")
+                    continue
+                if summary:
+                    summaries.append(summary)
+    except Exception as e:
+        logger.error(f"Error loading JSON file {filepath}: {e}")
 
-    merged['articles'] = unique_articles
-    return merged
+    return summaries
 
 
 def calculate_statistics(data_dir: str = "data/raw") -> Dict:
     """Calculate statistics from scraped data"""
     stats = {
         'total_files': 0,
+        'total_results': 0,
         'total_articles': 0,
         'competitors': {},
         'date_range': {
@@ -165,42 +517,55 @@ def calculate_statistics(data_dir: str = "data/raw") -> Dict:
         }
     }
 
+    # Per-competitor .jsonl files, plus per-scrape .json files from before
+    # results were appended. A .jsonl file holds many results (one per
+    # line), so results are counted separately from files
     data_path = Path(data_dir)
-    json_files = list(data_path.glob("*.json"))
-
-    stats['total_files'] = len(json_files)
-
-    for file in json_files:
-        data = load_json_file(file)
-        if data:
-            competitor = data.get('competitor', 'Unknown')
-            articles = data.get('articles', [])
-
-            if competitor not in stats['competitors']:
-                stats['competitors'][competitor] = {
-                    'file_count': 0,
-                    'article_count': 0,
-                    'error_count': 0
-                }
-
-            stats['competitors'][competitor]['file_count'] += 1
-            stats['competitors'][competitor]['article_count'] += len(articles)
-            if 'error' in data:
-                stats['competitors'][competitor]['error_count'] += 1
-
-            stats['total_articles'] += len(articles)
-
-            # Update date range
-            timestamp = data.get('timestamp')
-            if timestamp:
-                if not stats['date_range']['start'] or timestamp < stats['date_range']['start']:
-                    stats['date_range']['start'] = timestamp
-                if not stats['date_range']['end'] or timestamp > stats['date_range']['end']:
-                    stats['date_range']['end'] = timestamp
+    result_files = list(data_path.glob("*.jsonl")) + list(data_path.glob("*.json"))
+    stats['total_files'] = len(result_files)
+
+    # Read the files concurrently, then fold them into the stats here
+    for summaries in _map_files(summarize_data_file, result_files):
+        file_competitors = set()
+        for summary in summaries:
+            _add_summary(stats, summary, summary['competitor'] not in file_competitors)
+            file_competitors.add(summary['competitor'])
 
     return stats
 
 
+def _add_summary(stats: Dict, summary: Dict, new_file: bool) -> None:
+    """Fold one result summary into calculate_statistics' totals"""
+    competitor = summary['competitor']
+    article_count = summary['article_count']
+
+    if competitor not in stats['competitors']:
+        stats['competitors'][competitor] = {
+            'file_count': 0,
+            'result_count': 0,
+            'article_count': 0,
+            'error_count': 0
+        }
+
+    if new_file:
+        stats['competitors'][competitor]['file_count'] += 1
+    stats['competitors'][competitor]['result_count'] += 1
+    stats['competitors'][competitor]['article_count'] += article_count
+    if summary['has_error']:
+        stats['competitors'][competitor]['error_count'] += 1
+
+    stats['total_results'] += 1
+    stats['total_articles'] += article_count
+
+    # Update date range
+    timestamp = summary['timestamp']
+    if timestamp:
+        if not stats['date_range']['start'] or timestamp < stats['date_range']['start']:
+            stats['date_range']['start'] = timestamp
+        if not stats['date_range']['end'] or timestamp > stats['date_range']['end']:
+            stats['date_range']['end'] = timestamp
+
+
 def main():
     """Test utility functions"""
     print("Testing utility functions...")